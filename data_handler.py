@@ -1,35 +1,192 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
 import yfinance as yf
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 
-def get_price_data(tickers, start='2019-01-01', end='2024-12-31'):
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+price_cache_ttl = 24 * 60 * 60  # seconds
+price_cache_max_entries = 64
+# Ticker lists longer than one shard are downloaded as concurrent yf.download calls
+download_shard_size = 20
+download_max_workers = 8
+
+# In-process layer in front of the on-disk cache, keyed like the cache files and
+# holding (fetched_at, close_data); insertion order doubles as eviction order
+_price_cache = {}
+_price_cache_lock = threading.Lock()
+
+def get_price_data(tickers, start='2019-01-01', end='2024-12-31', align=True):
     """
     Downloads Close prices for the given tickers between the given date range.
+
+    Results are cached in process and on disk under .cache/ for a day, keyed
+    on the ticker set and dates, so repeated requests skip the network.
+    Downloads missing any requested symbol are returned but not cached.
     
     Parameters:
         tickers (list or str): Stock tickers (e.g., ['AAPL', 'MSFT'] or 'AAPL')
         start (str): Start date in format 'YYYY-MM-DD'
         end (str): End date in format 'YYYY-MM-DD'
+        align (bool): Forward-fill and keep only dates every ticker has; with False
+            each column keeps its own NaNs for the caller to drop per ticker
 
     Returns:
-        pd.DataFrame: Close prices with dates as index and tickers as columns
+        pd.DataFrame: Close prices with dates as index and tickers as columns,
+            in the order requested
+    """
+    # Repeated symbols would otherwise come back as duplicate columns
+    symbols = list(dict.fromkeys(t.upper() for t in ([tickers] if isinstance(tickers, str) else tickers)))
+    unique_symbols = sorted(set(symbols))
+    key = hashlib.md5(repr((unique_symbols, start, end, align)).encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.pkl")
+
+    close_data = _load_cached_prices(key, path)
+    if close_data is None:
+        close_data = _download_price_data(unique_symbols, start, end, align=align)
+        if close_data.empty:
+            return close_data
+        # A partial download (e.g. one symbol rate-limited) is returned but not kept,
+        # so the next request retries the missing symbols
+        if set(close_data.columns) == set(unique_symbols):
+            _store_cached_prices(key, path, close_data)
+
+    return close_data.reindex(columns=symbols).dropna(axis=1, how='all')
+
+def _remember_prices(key, fetched_at, close_data):
+    """
+    Adds an entry to the in-process cache, evicting the oldest beyond the size limit.
+    """
+    with _price_cache_lock:
+        _price_cache.pop(key, None)
+        _price_cache[key] = (fetched_at, close_data)
+        while len(_price_cache) > price_cache_max_entries:
+            _price_cache.pop(next(iter(_price_cache)))
+
+def _load_cached_prices(key, path):
+    """
+    Returns cached Close prices younger than price_cache_ttl, or None.
+
+    Any problem reading the disk cache is treated as a miss so the caller downloads.
+    """
+    now = time.time()
+    with _price_cache_lock:
+        entry = _price_cache.get(key)
+    if entry is not None:
+        fetched_at, close_data = entry
+        if now - fetched_at < price_cache_ttl:
+            return close_data
+        with _price_cache_lock:
+            _price_cache.pop(key, None)
+
+    try:
+        fetched_at = os.path.getmtime(path)
+        if now - fetched_at >= price_cache_ttl:
+            return None
+        close_data = pd.read_pickle(path)
+    except Exception:
+        return None
+    _remember_prices(key, fetched_at, close_data)
+    return close_data
+
+def _store_cached_prices(key, path, close_data):
+    """
+    Caches Close prices in process and on disk; disk failures are ignored.
+    """
+    _remember_prices(key, time.time(), close_data)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a private file and rename it into place, so concurrent readers
+        # never see a half-written pickle
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        os.close(fd)
+        close_data.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"[WARN] Could not write price cache: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _download_price_data(symbols, start, end, align=True):
+    """
+    Fetches Close prices for a list of upper-cased tickers from Yahoo Finance.
+
+    Lists longer than download_shard_size are split into shards downloaded
+    concurrently; a failed shard only loses its own symbols. Unless align is
+    False, gaps are forward-filled and only dates every ticker has are kept.
+    """
+    shards = [symbols[i:i + download_shard_size] for i in range(0, len(symbols), download_shard_size)]
+    if len(shards) > 1:
+        with ThreadPoolExecutor(max_workers=min(download_max_workers, len(shards))) as executor:
+            close_data = pd.concat(list(executor.map(lambda shard: _download_close(shard, start, end), shards)),
+                                   axis=1)
+    else:
+        close_data = _download_close(symbols, start, end)
+
+    if close_data.empty:
+        return close_data
+
+    # Shards may come back in any order; restore the requested order
+    close_data = close_data.reindex(columns=symbols).dropna(axis=1, how='all')
+    if not align:
+        # Independent series: one recent listing must not truncate the others' history
+        return close_data
+
+    # Fill isolated gaps and drop tickers with no data at all instead of losing every
+    # date on which a single ticker is missing; only leading rows remain to drop
+    return close_data.ffill().dropna()
+
+def _download_close(symbols, start, end):
+    """
+    Fetches raw Close prices for one shard of tickers; empty on failure.
     """
     try:
-        data = yf.download(tickers, start=start, end=end, progress=False)
+        # threads=True fans the per-symbol requests out over yfinance's own pool
+        data = yf.download(symbols, start=start, end=end, progress=False,
+                           threads=True, group_by='column', auto_adjust=True)
 
         # Handle MultiIndex if multiple tickers
         if isinstance(data.columns, pd.MultiIndex):
-            close_data = data['Close']
+            close_data = data.xs('Close', axis=1, level=0, drop_level=True)
         else:
             # Single ticker case: wrap it as a DataFrame with ticker name as column
             close_data = data[['Close']]
-            if isinstance(tickers, str):
-                close_data.columns = [tickers]
+            close_data.columns = symbols[:1]
 
-        return close_data.dropna()
+        # yfinance sorts columns alphabetically; restore the requested order
+        return close_data.reindex(columns=symbols)
 
     except Exception as e:
         print(f"[ERROR] Failed to fetch data: {e}")
         return pd.DataFrame()
 
 
+def validate_tickers(tickers):
+    """
+    Splits tickers into those Yahoo has recent prices for and those it has not.
+
+    One batched download of the last few sessions checks every symbol; a quote
+    lookup per symbol would pull a full year of history each. A failed request
+    leaves every symbol looking invalid, so results with invalid tickers should
+    not be cached.
+
+    Parameters:
+        tickers (list): Stock tickers (e.g., ['AAPL', 'MSFT'])
+
+    Returns:
+        tuple: (valid, invalid) lists of upper-cased tickers, in input order
+    """
+    symbols = [t.upper() for t in tickers]
+    # yfinance's end date is exclusive; ten calendar days spans any holiday run
+    end = date.today() + timedelta(days=1)
+    start = end - timedelta(days=10)
+    quoted = set(_download_price_data(sorted(set(symbols)), start.isoformat(), end.isoformat()).columns)
 
+    valid = [s for s in symbols if s in quoted]
+    invalid = [s for s in symbols if s not in quoted]
+    return valid, invalid
@@ -1,11 +1,75 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from data_handler import get_price_data
-from optimizer import optimize_portfolio
+from data_handler import get_price_data, validate_tickers
+from optimizer import (calculate_portfolio_performance, compute_moments, factorize_covariance,
+                       frontier_weights, optimize_portfolio)
 from visuals import plot_weights, plot_return_vs_risk
 from portfolio_analyzer import PortfolioAnalyzer
-from portfolio_optimizer import PortfolioOptimizer
+
+class UncachedResult(Exception):
+    """Carries a result out of an st.cache_data function so Streamlit does not memoize it."""
+    def __init__(self, result):
+        super().__init__("result not cached")
+        self.result = result
+
+@st.cache_data(ttl=3600)
+def cached_price_data(tickers, start, end, align=True):
+    """Memoize parsed price data across Streamlit reruns for identical requests."""
+    price_data = get_price_data(list(tickers), start=start, end=end, align=align)
+    if price_data.empty or set(price_data.columns) != set(tickers):
+        # A failed or partial download; keep it out of the cache so the next call retries
+        raise UncachedResult(price_data)
+    return price_data
+
+def load_price_data(tickers, start, end, align=True):
+    """
+    Price loader shared by every tab. The cache key ignores ticker order so
+    overlapping requests from different tabs hit the same entry; columns come
+    back in the requested order.
+    """
+    symbols = [t.upper() for t in tickers]
+    try:
+        price_data = cached_price_data(tuple(sorted(set(symbols))), start, end, align)
+    except UncachedResult as e:
+        # Serve what did download this time; the next request retries the rest
+        price_data = e.result
+    return price_data.reindex(columns=symbols).dropna(axis=1, how='all')
+
+@st.cache_data(ttl=3600)
+def cached_ticker_validation(tickers):
+    """Memoize the ticker preflight so resubmitting a form does not re-query quotes."""
+    valid, invalid = validate_tickers(list(tickers))
+    # An invalid ticker may just be a failed request, so only clean results are memoized
+    if invalid:
+        raise UncachedResult((valid, invalid))
+    return valid, invalid
+
+def preflight_tickers(tickers):
+    """Split tickers into (valid, invalid), memoizing only results with no invalid tickers."""
+    try:
+        return cached_ticker_validation(tuple(tickers))
+    except UncachedResult as e:
+        return e.result
+
+@st.cache_data(ttl=3600)
+def cached_moments(tickers, start, end):
+    """
+    Memoize return moments and the covariance factor so re-optimizing the same
+    universe, or sweeping its target return, is a pure numeric call.
+    """
+    mean_returns, cov_matrix = compute_moments(load_price_data(tickers, start, end))
+    try:
+        cov_factor = factorize_covariance(cov_matrix)
+    except np.linalg.LinAlgError:
+        cov_factor = None
+    return mean_returns, cov_matrix, cov_factor
+
+@st.cache_resource
+def get_analyzer():
+    """Build the analyzer once per process instead of on every Streamlit rerun."""
+    return PortfolioAnalyzer(price_loader=load_price_data)
 
 def main():
     st.title("📈 Portfolio Optimizer")
@@ -13,9 +77,8 @@ def main():
     # Create tabs for different functionalities
     tab1, tab2, tab3 = st.tabs(["Portfolio Analysis", "Portfolio Optimization", "Stock Recommendations"])
 
-    # Initialize analyzers
-    analyzer = PortfolioAnalyzer()
-    optimizer = PortfolioOptimizer()
+    # Initialize analyzer
+    analyzer = get_analyzer()
 
     with tab1:
         st.header("Analyze Your Portfolio")
@@ -46,7 +109,6 @@ def main():
             
             if submitted and portfolio_data:
                 try:
-                    analyzer = PortfolioAnalyzer()
                     results = analyzer.analyze_proposed_portfolio(portfolio_data)
                     
                     if "error" in results:
@@ -154,16 +216,25 @@ def main():
             
             if opt_submitted:
                 try:
-                    # Parse input
-                    opt_ticker_list = [t.strip() for t in opt_tickers.split(",")]
+                    # Parse input; repeated tickers would become duplicate price columns
+                    opt_ticker_list = list(dict.fromkeys(t.strip().upper() for t in opt_tickers.split(",")))
+                    
+                    # Drop unknown symbols before the history download
+                    opt_ticker_list, invalid_tickers = preflight_tickers(opt_ticker_list)
+                    if invalid_tickers:
+                        st.warning(f"Skipping unrecognized tickers: {', '.join(invalid_tickers)}")
+                    if not opt_ticker_list:
+                        st.error("None of the tickers could be found. Please check ticker symbols.")
+                        st.stop()
                     
                     # Get historical data
                     end_date = pd.Timestamp.now()
                     start_date = end_date - pd.DateOffset(years=1)
                     
-                    price_data = get_price_data(opt_ticker_list, 
-                                              start=start_date.strftime("%Y-%m-%d"),
-                                              end=end_date.strftime("%Y-%m-%d"))
+                    price_key = (tuple(opt_ticker_list),
+                                 start_date.strftime("%Y-%m-%d"),
+                                 end_date.strftime("%Y-%m-%d"))
+                    price_data = load_price_data(*price_key)
                     
                     if price_data.empty:
                         st.error("Failed to fetch price data. Please check ticker symbols.")
@@ -171,24 +242,22 @@ def main():
                     
                     # Optimize portfolio
                     try:
-                        optimal_portfolio = optimize_portfolio(price_data)
-                        optimal_weights = optimal_portfolio['weights']
-                        
-                        # Calculate optimal allocation
-                        allocation = {ticker: weight * investment_amount 
-                                    for ticker, weight in zip(opt_ticker_list, optimal_weights)}
+                        mean_returns, cov_matrix, cov_factor = cached_moments(*price_key)
+                        optimal_portfolio = optimize_portfolio(price_data, moments=(mean_returns, cov_matrix),
+                                                               cov_factor=cov_factor)
+                        optimal_weights = pd.Series(optimal_portfolio['weights'])
                         
                         # Display results
                         st.subheader("Optimal Portfolio Allocation")
                         
-                        # Create a DataFrame for better display
+                        # Build the allocation table in one vectorized pass and format on render
                         allocation_df = pd.DataFrame({
-                            'Ticker': opt_ticker_list,
-                            'Weight': [f"{w*100:.2f}%" for w in optimal_weights],
-                            'Amount': [f"${a:,.2f}" for a in allocation.values()]
+                            'Ticker': optimal_weights.index,
+                            'Weight': optimal_weights.values,
+                            'Amount': optimal_weights.values * investment_amount
                         })
                         
-                        st.dataframe(allocation_df)
+                        st.dataframe(allocation_df.style.format({'Weight': '{:.2%}', 'Amount': '${:,.2f}'}))
                         
                         # Display portfolio metrics
                         st.subheader("Portfolio Metrics")
@@ -198,8 +267,8 @@ def main():
                         
                         # Create pie chart
                         fig = go.Figure(data=[go.Pie(
-                            labels=opt_ticker_list,
-                            values=optimal_weights,
+                            labels=optimal_weights.index,
+                            values=optimal_weights.values,
                             hole=.3
                         )])
                         
@@ -210,6 +279,27 @@ def main():
                         
                         st.plotly_chart(fig)
                         
+                        # Efficient-frontier portfolio for the requested target return; a single
+                        # asset has no frontier to move along, so its Lagrange system is singular
+                        if cov_factor is not None and len(mean_returns) >= 2:
+                            st.subheader("Minimum-Variance Portfolio at Target Return")
+                            try:
+                                target_weights = frontier_weights(mean_returns, cov_factor, target_return / 100)
+                            except np.linalg.LinAlgError:
+                                st.info("No target-return portfolio exists for these tickers.")
+                            else:
+                                target_ret, target_risk = calculate_portfolio_performance(
+                                    target_weights, mean_returns, cov_matrix)
+                                
+                                target_df = pd.DataFrame({
+                                    'Ticker': price_data.columns,
+                                    'Weight': target_weights
+                                })
+                                st.dataframe(target_df.style.format({'Weight': '{:.2%}'}))
+                                st.caption("Short positions are allowed here; negative weights are shorts.")
+                                st.metric("Expected Annual Return", f"{target_ret*100:.2f}%")
+                                st.metric("Expected Annual Volatility", f"{target_risk*100:.2f}%")
+                        
                     except ValueError as e:
                         st.error(f"Failed to optimize portfolio: {str(e)}")
                         st.stop()
@@ -241,7 +331,7 @@ def main():
             if rec_submitted:
                 try:
                     # Parse input
-                    rec_ticker_list = [t.strip() for t in rec_tickers.split(",")]
+                    rec_ticker_list = [t.strip().upper() for t in rec_tickers.split(",")]
                     rec_price_list = [float(p.strip()) for p in rec_prices.split(",")]
                     rec_share_list = [int(s.strip()) for s in rec_shares.split(",")]
                     
@@ -252,6 +342,15 @@ def main():
                     # Create portfolio data
                     rec_portfolio_data = {ticker: (price, share) for ticker, price, share in zip(rec_ticker_list, rec_price_list, rec_share_list)}
                     
+                    # Drop unknown symbols before the analyzer downloads history
+                    valid_tickers, invalid_tickers = preflight_tickers(rec_ticker_list)
+                    if invalid_tickers:
+                        st.warning(f"Skipping unrecognized tickers: {', '.join(invalid_tickers)}")
+                    rec_portfolio_data = {ticker: rec_portfolio_data[ticker] for ticker in valid_tickers}
+                    if not rec_portfolio_data:
+                        st.error("None of the tickers could be found. Please check ticker symbols.")
+                        st.stop()
+                    
                     # Get recommendations
                     recommendations = analyzer.recommend_stocks(rec_portfolio_data)
                     
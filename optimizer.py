@@ -1,60 +1,400 @@
 import numpy as np
-from scipy.optimize import minimize
+from numba import njit, prange
+from scipy.linalg import cho_factor, cho_solve
+from scipy.linalg.blas import dsymv
 
 trading_days = 252
+kkt_tolerance = 1e-4
+float32_max_condition = 1e6
+symv_min_assets = 50
+softmax_restarts = 5
+held_weight_tolerance = 1e-6
+projected_gradient_max_assets = 32
+projected_gradient_iters = 500
 
 def calculate_portfolio_performance(weights, mean_returns, cov_matrix):
     """
     Calculates expected portfolio return and risk (volatility).
+
+    mean_returns and cov_matrix are plain ndarrays so the solver loop
+    never dispatches through pandas. The quadratic form is a single einsum
+    contraction, switching to BLAS dsymv for larger universes.
     """
-    ret = np.dot(weights, mean_returns)* trading_days
-    risk = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights))* trading_days)
+    ret = weights @ mean_returns * trading_days
+    if len(weights) > symv_min_assets:
+        variance = weights @ dsymv(1.0, cov_matrix, weights)
+    else:
+        variance = np.einsum('i,ij,j->', weights, cov_matrix, weights)
+    risk = np.sqrt(variance * trading_days)
     return ret, risk
 
+@njit(cache=True, fastmath=True)
+def _neg_sharpe_and_grad_into(weights, mean_returns, cov_matrix, risk_free_rate, cov_w, grad):
+    """
+    Negative Sharpe ratio, writing its gradient into grad and using cov_w as scratch.
+
+    Explicit loops beat BLAS dispatch for the handful of assets we optimize over.
+    The covariance product reads only the upper triangle, column by column, so
+    a Fortran-ordered matrix is walked with unit stride (the dsymv access pattern).
+    """
+    n = weights.shape[0]
+    cov_w[:] = 0.0
+    for j in range(n):
+        wj = weights[j]
+        acc = cov_matrix[j, j] * wj
+        for i in range(j):
+            cov_w[i] += cov_matrix[i, j] * wj
+            acc += cov_matrix[i, j] * weights[i]
+        cov_w[j] += acc
+
+    ret = 0.0
+    var = 0.0
+    for i in range(n):
+        cov_w[i] *= trading_days
+        ret += weights[i] * mean_returns[i]
+        var += weights[i] * cov_w[i]
+    ret *= trading_days
+    risk = np.sqrt(var)
+    excess = ret - risk_free_rate
+
+    for i in range(n):
+        grad[i] = -mean_returns[i] * trading_days / risk + excess / risk**3 * cov_w[i]
+    return -excess / risk
+
+@njit(cache=True, fastmath=True)
+def _neg_sharpe_and_grad(weights, mean_returns, cov_matrix, risk_free_rate):
+    """
+    Negative Sharpe ratio and its gradient in one compiled pass.
+    """
+    n = weights.shape[0]
+    grad = np.empty(n)
+    value = _neg_sharpe_and_grad_into(weights, mean_returns, cov_matrix, risk_free_rate,
+                                      np.empty(n), grad)
+    return value, grad
+
 def negative_sharpe_ratio(weights, mean_returns, cov_matrix, risk_free_rate=0.01):
     """
     Objective function: negative Sharpe ratio (because we minimize in scipy).
     """
-    ret, risk = calculate_portfolio_performance(weights, mean_returns, cov_matrix)
-    return -(ret - risk_free_rate) / risk
+    return _neg_sharpe_and_grad(weights, mean_returns, cov_matrix, risk_free_rate)[0]
+
+def negative_sharpe_gradient(weights, mean_returns, cov_matrix, risk_free_rate=0.01):
+    """
+    Analytic gradient of negative_sharpe_ratio, used by kkt_residual to check optimality.
+    """
+    return _neg_sharpe_and_grad(weights, mean_returns, cov_matrix, risk_free_rate)[1]
+
+@njit(cache=True, fastmath=True)
+def _softmax_into(theta, weights):
+    """
+    Numerically stable softmax, mapping unconstrained parameters onto the simplex.
+    """
+    peak = theta.max()
+    total = 0.0
+    for i in range(theta.shape[0]):
+        weights[i] = np.exp(theta[i] - peak)
+        total += weights[i]
+    for i in range(theta.shape[0]):
+        weights[i] /= total
+
+@njit(cache=True)
+def _softmax(theta):
+    """
+    Allocating wrapper around _softmax_into.
+    """
+    weights = np.empty(theta.shape[0])
+    _softmax_into(theta, weights)
+    return weights
+
+@njit(cache=True, fastmath=True)
+def _neg_sharpe_softmax_and_grad(theta, mean_returns, cov_matrix, risk_free_rate,
+                                 weights, cov_w, grad_w):
+    """
+    Negative Sharpe ratio of w = softmax(θ) and its gradient with respect to θ.
+
+    Back-propagates through the softmax Jacobian: dL/dθ = w ⊙ (dL/dw − w·dL/dw).
+    weights, cov_w and grad_w are caller-owned scratch buffers.
+    """
+    _softmax_into(theta, weights)
+    value = _neg_sharpe_and_grad_into(weights, mean_returns, cov_matrix, risk_free_rate,
+                                      cov_w, grad_w)
+    return value, weights * (grad_w - weights @ grad_w)
+
+def make_objective(mean_returns, cov_matrix, risk_free_rate=0.01):
+    """
+    Unconstrained objective over softmax parameters θ for scipy with jac=True.
+
+    The simplex constraint is built into the parametrization, and the scratch
+    buffers are allocated once per optimization rather than on every call.
+    The returned gradient is a fresh array, since scipy may hold on to it.
+    """
+    num_assets = len(mean_returns)
+    weights = np.empty(num_assets)
+    cov_w = np.empty(num_assets)
+    grad_w = np.empty(num_assets)
+
+    def objective(theta):
+        return _neg_sharpe_softmax_and_grad(theta, mean_returns, cov_matrix, risk_free_rate,
+                                            weights, cov_w, grad_w)
+    return objective
+
+@njit(cache=True)
+def project_simplex(v):
+    """
+    Euclidean projection onto the simplex {w : w >= 0, sum(w) = 1}.
 
-def optimize_portfolio(price_data, risk_free_rate=0.01):
+    Duchi et al. (2008): sort descending, then the threshold is set by the
+    last prefix whose cumulative sum still leaves its smallest entry positive.
+    """
+    u = np.sort(v)[::-1]
+    css = 0.0
+    theta = 0.0
+    for k in range(u.shape[0]):
+        css += u[k]
+        t = (css - 1.0) / (k + 1)
+        theta = t if u[k] > t else theta
+    return np.maximum(v - theta, 0.0)
+
+def factorize_covariance(cov_matrix):
+    """
+    Cholesky factor of the annualized covariance, reusable across cho_solve calls.
+
+    Covariances of returns are symmetric positive-definite, so Cholesky is
+    both cheaper and more stable than a general LU solve. The factor is
+    computed in float32, since the moments only carry a few significant
+    figures, unless the covariance is too ill-conditioned for single precision.
+    """
+    annualized = cov_matrix * trading_days
+    try:
+        factor = cho_factor(annualized.astype(np.float32), lower=True)
+        diag = np.abs(np.diag(factor[0]))
+        if (diag.max() / diag.min()) ** 2 < float32_max_condition:
+            return factor
+    except np.linalg.LinAlgError:
+        pass
+    return cho_factor(annualized, lower=True)
+
+def tangency_weights(mean_returns, cov_matrix, risk_free_rate=0.01, cov_factor=None):
+    """
+    Closed-form tangency portfolio w ∝ Σ⁻¹(μ − r_f·1), projected to long-only.
+
+    The risk-free rate is baked into the linear system so the solution
+    maximizes the Sharpe ratio on excess return rather than raw return.
+
+    Returns:
+        tuple: (weights, clipped) where weights is None if no long-only
+            portfolio has positive excess return, and clipped tells whether
+            any short position had to be projected away.
+    """
+    if cov_factor is None:
+        cov_factor = factorize_covariance(cov_matrix)
+    excess = (mean_returns * trading_days - risk_free_rate).astype(cov_factor[0].dtype)
+    z = cho_solve(cov_factor, excess).astype(np.float64)
+    total = z.sum()
+    if total <= 0:
+        return None, True
+    return project_simplex(z / total), bool((z < 0).any())
+
+def min_variance_weights(cov_factor):
+    """
+    Closed-form global minimum-variance portfolio Σ⁻¹1 / 1ᵀΣ⁻¹1 (shorts allowed).
+
+    Together with the tangency direction this spans the efficient frontier.
+    """
+    z = cho_solve(cov_factor, np.ones(len(cov_factor[0]), dtype=cov_factor[0].dtype))
+    return z / z.sum()
+
+def frontier_weights(mean_returns, cov_factor, target_return):
+    """
+    Minimum-variance weights for an annual target return (Merton 1972, shorts allowed).
+
+    Only the 2×2 system in the Lagrange multipliers of the budget and return
+    constraints depends on the target, so sweeping targets reuses the factor.
+    """
+    mu = mean_returns * trading_days
+    # Two-fund form: the frontier mixes the global minimum-variance portfolio with Σ⁻¹μ
+    min_variance = min_variance_weights(cov_factor)
+    inv_mu = cho_solve(cov_factor, mu)
+    b, c = inv_mu.sum(), mu @ inv_mu
+    lam, gamma = np.linalg.solve([[c, mu @ min_variance], [b, 1.0]], [target_return, 1.0])
+    return lam * inv_mu + gamma * min_variance
+
+def kkt_residual(weights, mean_returns, cov_matrix, risk_free_rate=0.01):
+    """
+    Largest violation of the long-only max-Sharpe optimality conditions.
+
+    At the optimum the Sharpe gradient equals the budget multiplier wᵀ∇ on
+    held assets and does not exceed it on assets held at (numerically) zero.
+    """
+    grad = -negative_sharpe_gradient(weights, mean_returns, cov_matrix, risk_free_rate)
+    excess_grad = grad - weights @ grad
+    held = weights > held_weight_tolerance
+    violations = np.where(held, np.abs(excess_grad), np.maximum(excess_grad, 0))
+    return violations.max()
+
+@njit(cache=True, parallel=True)
+def _mean_cov(returns):
+    """
+    Row means and sample covariance of an (assets, days) return matrix.
+
+    Explicit loops rather than np.cov, which is slow under Numba. Each asset's
+    series is contiguous, and the covariance is allocated in Fortran order.
+    """
+    n, t = returns.shape
+    mean_returns = np.empty(n)
+    for i in prange(n):
+        acc = 0.0
+        for k in range(t):
+            acc += returns[i, k]
+        mean_returns[i] = acc / t
+
+    cov_matrix = np.empty((n, n)).T
+    for j in prange(n):
+        for i in range(j + 1):
+            acc = 0.0
+            for k in range(t):
+                acc += (returns[i, k] - mean_returns[i]) * (returns[j, k] - mean_returns[j])
+            cov_matrix[i, j] = acc / (t - 1)
+            cov_matrix[j, i] = cov_matrix[i, j]
+    return mean_returns, cov_matrix
+
+@njit(cache=True)
+def _projected_gradient_sharpe(mean_returns, cov_matrix, risk_free_rate, iters, step):
+    """
+    Long-only max-Sharpe weights by projected gradient descent on the simplex.
+
+    Starts from equal weights; a step is kept only if it lowers the negative
+    Sharpe ratio (growing the step), otherwise the step is halved.
+    """
+    n = mean_returns.shape[0]
+    weights = np.full(n, 1.0 / n)
+    value, grad = _neg_sharpe_and_grad(weights, mean_returns, cov_matrix, risk_free_rate)
+    for _ in range(iters):
+        candidate = project_simplex(weights - step * grad)
+        candidate_value, candidate_grad = _neg_sharpe_and_grad(candidate, mean_returns, cov_matrix,
+                                                               risk_free_rate)
+        if candidate_value < value:
+            moved = np.abs(candidate - weights).max()
+            weights, value, grad = candidate, candidate_value, candidate_grad
+            step *= 1.5
+            if moved < 1e-10:
+                break
+        else:
+            step *= 0.5
+            if step < 1e-12:
+                break
+    return weights
+
+def _softmax_sharpe(mean_returns, cov_matrix, risk_free_rate):
+    """
+    Long-only max-Sharpe weights by L-BFGS-B over softmax parameters.
+
+    scipy.optimize is imported here so the common small-universe path never loads it.
+    """
+    from scipy.optimize import minimize
+
+    # θ = 0 is the equal-weight portfolio. Weights the softmax drives towards
+    # zero lose their gradient, so restart from a blend with equal weights
+    # while a dropped asset still violates the optimality conditions.
+    num_assets = len(mean_returns)
+    objective = make_objective(mean_returns, cov_matrix, risk_free_rate)
+    theta = np.zeros(num_assets)
+    for _ in range(softmax_restarts):
+        result = minimize(
+            objective,
+            theta,
+            method='L-BFGS-B',
+            jac=True,
+            options={'ftol': 1e-12, 'gtol': 1e-9}
+        )
+
+        if not result.success:
+            raise ValueError("Optimization failed.")
+        weights = _softmax(result.x)
+        if kkt_residual(weights, mean_returns, cov_matrix, risk_free_rate) <= kkt_tolerance:
+            break
+        theta = np.log(0.5 * weights + 0.5 / num_assets)
+    return weights
+
+def _warm_up():
+    """
+    Compile (or load from the on-disk cache) the kernels for both solver dtypes.
+    """
+    for dtype in (np.float32, np.float64):
+        _neg_sharpe_and_grad(np.full(2, 0.5), np.zeros(2, dtype=dtype),
+                             np.asfortranarray(np.eye(2), dtype=dtype), 0.0)
+        make_objective(np.zeros(2, dtype=dtype), np.asfortranarray(np.eye(2), dtype=dtype), 0.0)(np.zeros(2))
+        _projected_gradient_sharpe(np.zeros(2, dtype=dtype), np.asfortranarray(np.eye(2), dtype=dtype),
+                                   0.0, 1, 0.5)
+    project_simplex(np.full(2, 0.5))
+    _softmax(np.zeros(2))
+
+# Warm up at import rather than on the first optimize click
+_warm_up()
+
+def compute_moments(price_data):
+    """
+    Daily mean returns and covariance of a price frame, as ndarrays ready for the solver.
+
+    Uses continuously-compounded (log) returns computed in a single NumPy pass,
+    laid out one asset per row so the moment kernel streams each series.
+    The covariance is returned in Fortran order to match the objective's column walk.
+    """
+    log_returns = np.diff(np.log(price_data.to_numpy().T), axis=1)
+    return _mean_cov(np.ascontiguousarray(log_returns))
+
+def optimize_portfolio(price_data, risk_free_rate=0.01, moments=None, cov_factor=None):
     """
     Runs portfolio optimization to maximize Sharpe ratio.
 
+    Uses the closed-form tangency portfolio and only falls back to an
+    iterative solve when the long-only bound binds and the projected solution
+    is not optimal. Small universes use a jitted projected-gradient loop;
+    larger ones run L-BFGS-B over softmax parameters.
+    The solver works at the precision of the covariance factor (float32
+    when well-conditioned); the reported metrics are recomputed in float64.
+
     Parameters:
         price_data (pd.DataFrame): Close prices from data_handler
+        moments (tuple): Optional precomputed (mean_returns, cov_matrix) from
+            compute_moments, so repeated optimizations skip the returns pass
+        cov_factor (tuple): Optional cached factorize_covariance result
 
     Returns:
-        dict: optimal weights, return, risk, Sharpe
+        dict: optimal weights (keyed by price_data column), return, risk, Sharpe
     """
-    returns = price_data.pct_change().dropna()
-    mean_returns = returns.mean()
-    cov_matrix = returns.cov()
+    if moments is None:
+        moments = compute_moments(price_data)
+    mean_returns, cov_matrix = moments
     num_assets = len(mean_returns)
-    
-    init_guess = np.array([1.0 / num_assets] * num_assets)
-    bounds = tuple((0, 1) for _ in range(num_assets))
-    constraints = {'type': 'eq', 'fun': lambda weights: np.sum(weights) - 1}
-
-    result = minimize(
-        negative_sharpe_ratio,
-        init_guess,
-        args=(mean_returns, cov_matrix, risk_free_rate),
-        method='SLSQP',
-        bounds=bounds,
-        constraints=constraints
-    )
-
-    if result.success:
-        weights = result.x
-        ret, risk = calculate_portfolio_performance(weights, mean_returns, cov_matrix)
-        sharpe = (ret - risk_free_rate) / risk
-        return {
-            'weights': weights,
-            'return': ret,
-            'risk': risk,
-            'sharpe': sharpe
-        }
+
+    try:
+        if cov_factor is None:
+            cov_factor = factorize_covariance(cov_matrix)
+        solver_dtype = cov_factor[0].dtype
+    except np.linalg.LinAlgError:
+        cov_factor, solver_dtype = None, np.float64
+    solver_mean = mean_returns.astype(solver_dtype)
+    solver_cov = np.asfortranarray(cov_matrix, dtype=solver_dtype)
+
+    if cov_factor is not None:
+        weights, clipped = tangency_weights(solver_mean, solver_cov, risk_free_rate, cov_factor)
     else:
-        raise ValueError("Optimization failed.")
+        weights, clipped = None, True
+
+    if weights is None or (clipped and kkt_residual(weights, solver_mean, solver_cov, risk_free_rate) > kkt_tolerance):
+        if num_assets < projected_gradient_max_assets:
+            weights = _projected_gradient_sharpe(solver_mean, solver_cov, risk_free_rate,
+                                                 projected_gradient_iters, 0.5)
+        else:
+            weights = _softmax_sharpe(solver_mean, solver_cov, risk_free_rate)
+
+    weights = weights.astype(np.float64)
+    ret, risk = calculate_portfolio_performance(weights, mean_returns, cov_matrix)
+    sharpe = (ret - risk_free_rate) / risk
+    return {
+        'weights': dict(zip(price_data.columns, weights)),
+        'return': ret,
+        'risk': risk,
+        'sharpe': sharpe
+    }
@@ -1,12 +1,98 @@
+import bisect
+import math
 import numpy as np
 import pandas as pd
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from numba import njit, prange
 from data_handler import get_price_data
 
+trading_days = 252
+sqrt_trading_days = math.sqrt(trading_days)
+
+# Opinion tiers: sorted thresholds and one message per interval between them.
+# Return and Sharpe tiers need to strictly exceed a threshold (bisect_left);
+# volatility tiers need to stay strictly below one (bisect_right).
+_return_thresholds = [0.05, 0.10, 0.15]
+_return_opinions = [
+    "Low return potential with annual return below 5%",
+    "Moderate return potential with annual return above 5%",
+    "Good return potential with annual return above 10%",
+    "Strong return potential with annual return above 15%"
+]
+_volatility_thresholds = [0.15, 0.25]
+_volatility_opinions = [
+    "Low volatility portfolio, suitable for conservative investors",
+    "Moderate volatility, balanced risk-reward profile",
+    "High volatility portfolio, suitable for aggressive investors"
+]
+_sharpe_thresholds = [1.0, 1.5]
+_sharpe_opinions = [
+    "Below-average risk-adjusted returns",
+    "Good risk-adjusted returns with Sharpe ratio above 1.0",
+    "Excellent risk-adjusted returns with Sharpe ratio above 1.5"
+]
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _simulate_paths(current_prices, drift, daily_vols, shocks, weights):
+    """
+    Compound random-walk price paths and the daily returns of the weighted portfolio.
+
+    shocks is a (days, tickers) block of standard normal draws. Each ticker's
+    path is compounded in parallel; the portfolio return for a day is the
+    weighted sum of that day's asset returns, so the paths are never re-read.
+    Buffers are Fortran-ordered so each ticker's walk over days is stride-1;
+    pass shocks in the same layout to keep the reads contiguous too.
+    """
+    num_days, num_tickers = shocks.shape
+    paths = np.empty((num_tickers, num_days)).T
+    daily_returns = np.empty((num_tickers, num_days)).T
+    for i in prange(num_tickers):
+        price = current_prices[i]
+        for t in range(num_days):
+            daily_return = drift + shocks[t, i] * daily_vols[i]
+            daily_returns[t, i] = daily_return
+            price *= 1.0 + daily_return
+            paths[t, i] = price
+
+    # The first simulated day has no previous simulated price, matching pct_change().dropna()
+    portfolio_returns = np.empty(num_days - 1)
+    for t in prange(1, num_days):
+        acc = 0.0
+        for i in range(num_tickers):
+            acc += weights[i] * daily_returns[t, i]
+        portfolio_returns[t - 1] = acc
+    return paths, portfolio_returns
+
+@dataclass
+class _PortfolioCore:
+    """Historical inputs shared by analyze_proposed_portfolio and recommend_stocks."""
+    total_investment: float
+    position_values: dict
+    weights: dict
+    historical_returns: pd.DataFrame
+    historical_volatility: pd.Series
+    portfolio_returns: pd.Series
+    annual_return: float
+    annual_volatility: float
+    beta: float
+    market_data: pd.DataFrame
+
 class PortfolioAnalyzer:
-    def __init__(self):
+    # Shared across instances: ETF metadata changes slowly, so fetch it once per process
+    _ticker_cache = {}
+    _holdings_cache = {}
+
+    def __init__(self, price_loader=get_price_data, seed=None):
         self.risk_free_rate = 0.05  # 5% risk-free rate assumption
+        # Callable with get_price_data's signature; lets the app share a cached loader
+        self.price_loader = price_loader
+        # One PCG64 generator per analyzer, reused by every projection; pass a seed for reproducible runs
+        self._rng = np.random.default_rng(seed)
+        # Finished analyses keyed by (sorted portfolio items, date); entries only live for the day
+        self._analysis_cache = {}
         # Define sector ETFs for diversification
         self.sector_etfs = {
             'XLK': 'Technology',
@@ -32,91 +118,70 @@ class PortfolioAnalyzer:
         Returns:
             dict: Analysis results including metrics and market conditions
         """
+        today = datetime.now().date()
+        key = (tuple(sorted(portfolio_data.items())), today)
+        if key in self._analysis_cache:
+            return self._analysis_cache[key]
+        
+        # Drop analyses from previous days before adding today's
+        self._analysis_cache = {k: v for k, v in self._analysis_cache.items() if k[1] == today}
+        result = self._analyze(portfolio_data)
+        # Errors are usually transient fetch failures, so only successful analyses are kept
+        if "error" not in result:
+            self._analysis_cache[key] = result
+        return result
+    
+    def _analyze(self, portfolio_data):
+        """Uncached body of analyze_proposed_portfolio."""
         try:
-            # Calculate total investment and weights
-            total_investment = sum(price * shares for price, shares in portfolio_data.values())
-            weights = {ticker: (price * shares) / total_investment 
-                      for ticker, (price, shares) in portfolio_data.items()}
-            
             # Get historical data for analysis
             end_date = datetime.now()
             start_date = end_date - timedelta(days=365)  # Use 1 year of historical data
             
-            # Get historical price data
-            tickers = list(portfolio_data.keys())
-            historical_data = get_price_data(tickers, start=start_date.strftime("%Y-%m-%d"), 
-                                          end=end_date.strftime("%Y-%m-%d"))
-            
-            if historical_data.empty:
+            core = self._compute_core(portfolio_data, start_date, end_date)
+            if core is None:
                 return {"error": "Failed to fetch historical price data. Please check ticker symbols."}
             
-            # Calculate historical returns and volatility
-            historical_returns = historical_data.pct_change().dropna()
-            historical_volatility = historical_returns.std() * np.sqrt(252)
-            
-            # Calculate historical portfolio metrics
-            historical_portfolio_returns = historical_returns.dot(pd.Series(weights))
-            historical_annual_return = historical_portfolio_returns.mean() * 252
-            historical_annual_volatility = historical_portfolio_returns.std() * np.sqrt(252)
-            historical_sharpe_ratio = (historical_annual_return - self.risk_free_rate) / historical_annual_volatility
+            tickers = list(portfolio_data.keys())
+            weights = core.weights
+            total_investment = core.total_investment
+            historical_volatility = core.historical_volatility
+            historical_annual_return = core.annual_return
+            historical_annual_volatility = core.annual_volatility
+            beta = core.beta
+            market_data = core.market_data
+            risk_free_rate = self.risk_free_rate
+            historical_sharpe_ratio = (historical_annual_return - risk_free_rate) / historical_annual_volatility
             
             # Calculate historical maximum drawdown
-            historical_cumulative_returns = (1 + historical_portfolio_returns).cumprod()
-            historical_rolling_max = historical_cumulative_returns.expanding().max()
+            historical_cumulative_returns = (1 + core.portfolio_returns.to_numpy()).cumprod()
+            historical_rolling_max = np.maximum.accumulate(historical_cumulative_returns)
             historical_drawdowns = historical_cumulative_returns / historical_rolling_max - 1
             historical_max_drawdown = historical_drawdowns.min()
             
-            # Calculate beta using S&P 500 as market proxy
-            market_data = get_price_data(['^GSPC'], start=start_date.strftime("%Y-%m-%d"), 
-                                       end=end_date.strftime("%Y-%m-%d"))
-            
-            # Initialize beta
-            beta = 1.0
-            
-            if not market_data.empty:
-                market_returns = market_data.pct_change().dropna()
-                common_index = historical_returns.index.intersection(market_returns.index)
-                
-                if len(common_index) > 0:
-                    # Use .loc to pick those dates out of the Series/DataFrame
-                    hist_portfolio_returns = historical_returns.dot(pd.Series(weights)).loc[common_index]
-                    # Grab the first (and only) column as a Series, then .loc the dates
-                    market_ret_series = market_returns.loc[common_index].iloc[:, 0]
-                    beta = np.cov(hist_portfolio_returns, market_ret_series)[0,1] / np.var(market_ret_series)
-            
-            # Generate future projections (252 trading days)
-            num_days = 252
-            future_prices = {}
-            dates = []
-            
-            # Generate dates
-            current_date = end_date
-            for _ in range(num_days):
-                current_date += timedelta(days=1)
-                if current_date.weekday() < 5:  # Only weekdays
-                    dates.append(current_date)
-            
-            # Generate price projections
-            for ticker in tickers:
-                current_price = portfolio_data[ticker][0]
-                daily_vol = historical_volatility[ticker] / np.sqrt(252)
-                # Generate random walk with drift based on historical return
-                daily_returns = np.random.normal(historical_annual_return/252, daily_vol, len(dates))
-                future_prices[ticker] = current_price * (1 + daily_returns).cumprod()
-            
-            # Create DataFrame for future prices
-            future_prices_df = pd.DataFrame(future_prices, index=dates)
+            # Generate future projections (one year of trading days)
+            num_days = trading_days
+            
+            # Generate business dates starting the day after end_date
+            dates = pd.bdate_range(end_date + timedelta(days=1), periods=num_days)
+            
+            # Generate price projections for all tickers in one batched draw
+            current_prices = np.array([portfolio_data[ticker][0] for ticker in tickers], dtype=np.float64)
+            daily_vols = historical_volatility.reindex(tickers).to_numpy() / sqrt_trading_days
+            weight_vector = np.array([weights[ticker] for ticker in tickers])
+            # Random walk with drift based on historical return
+            # Drawn ticker-major and transposed, so the (days, tickers) view is Fortran-ordered
+            shocks = self._rng.standard_normal((len(tickers), len(dates))).T
+            future_prices, projected_portfolio_returns = _simulate_paths(
+                current_prices, historical_annual_return / trading_days, daily_vols, shocks, weight_vector)
             
             # Calculate projected metrics
-            future_returns = future_prices_df.pct_change().dropna()
-            projected_portfolio_returns = future_returns.dot(pd.Series(weights))
-            projected_annual_return = projected_portfolio_returns.mean() * 252
-            projected_annual_volatility = projected_portfolio_returns.std() * np.sqrt(252)
-            projected_sharpe_ratio = (projected_annual_return - self.risk_free_rate) / projected_annual_volatility
+            projected_annual_return = projected_portfolio_returns.mean() * trading_days
+            projected_annual_volatility = projected_portfolio_returns.std(ddof=1) * sqrt_trading_days
+            projected_sharpe_ratio = (projected_annual_return - risk_free_rate) / projected_annual_volatility
             
-            # Calculate current portfolio value
-            current_value = {ticker: price * shares 
-                           for ticker, (price, shares) in portfolio_data.items()}
+            # Current portfolio value per position, already computed alongside the weights
+            current_value = core.position_values
             
             # Analyze market conditions
             market_conditions = self._analyze_market_conditions(market_data)
@@ -128,9 +193,9 @@ class PortfolioAnalyzer:
                 market_conditions
             )
             
-            # Prepare future prices for display
-            future_prices_display = future_prices_df.reset_index()
-            future_prices_display = future_prices_display.rename(columns={'index': 'Date'})
+            # Prepare future prices for display; the only DataFrame built from the simulated paths
+            future_prices_display = pd.DataFrame(future_prices, columns=tickers)
+            future_prices_display.insert(0, 'Date', dates)
             
             return {
                 "portfolio_metrics": {
@@ -158,6 +223,101 @@ class PortfolioAnalyzer:
         except Exception as e:
             return {"error": f"Error analyzing portfolio: {str(e)}"}
     
+    def _compute_core(self, portfolio_data, start_date, end_date):
+        """
+        Fetch history once and derive the inputs both public methods need.
+        
+        Returns:
+            _PortfolioCore: Weights, historical returns and risk, beta and market data,
+                or None if no historical prices could be fetched
+        
+        Raises:
+            ValueError: If some, but not all, portfolio tickers have no price data
+        """
+        # Calculate position values once, then total investment and weights from them
+        position_values = {ticker: price * shares for ticker, (price, shares) in portfolio_data.items()}
+        total_investment = sum(position_values.values())
+        weights = {ticker: value / total_investment for ticker, value in position_values.items()}
+        
+        # Get historical price data for the portfolio and the S&P 500 market proxy concurrently.
+        # Separate requests keep each on its own trading calendar, and the ^GSPC frame is
+        # portfolio-independent, so the loader's cache serves it to every analysis
+        tickers = list(portfolio_data.keys())
+        historical_data, market_data = self._fetch_prices([tickers, ['^GSPC']], start_date, end_date)
+        
+        if historical_data.empty:
+            return None
+
+        # The loader drops symbols it could not download; weighting only the survivors
+        # would silently understate the portfolio
+        missing = [ticker for ticker in tickers if ticker not in historical_data.columns]
+        if missing:
+            raise ValueError(f"No price data for {', '.join(missing)}. Please check ticker symbols.")
+
+        # Calculate historical returns and volatility
+        historical_returns = historical_data.pct_change(fill_method=None).dropna()
+        historical_volatility = historical_returns.std() * sqrt_trading_days
+        
+        # Calculate historical portfolio metrics
+        weight_vector = np.array([weights[ticker] for ticker in historical_data.columns])
+        historical_portfolio_returns = pd.Series(historical_returns.to_numpy() @ weight_vector,
+                                                 index=historical_returns.index)
+        historical_annual_return = historical_portfolio_returns.mean() * trading_days
+        historical_annual_volatility = historical_portfolio_returns.std() * sqrt_trading_days
+        
+        # Calculate beta using S&P 500 as market proxy
+        # Initialize beta
+        beta = 1.0
+        
+        if not market_data.empty:
+            market_returns = market_data.pct_change(fill_method=None).dropna()
+            common_index = historical_returns.index.intersection(market_returns.index)
+            
+            if len(common_index) > 0:
+                # Use .loc to pick those dates out of the Series/DataFrame
+                hist_portfolio_returns = historical_portfolio_returns.loc[common_index]
+                # Grab the first (and only) column as a Series, then .loc the dates
+                market_ret_series = market_returns.loc[common_index].iloc[:, 0]
+                # beta = Cov(p, m) / Var(m), with both sums taken over the same demeaned series
+                portfolio_values = hist_portfolio_returns.to_numpy()
+                market_deviations = market_ret_series.to_numpy() - market_ret_series.mean()
+                beta = (np.dot(portfolio_values - portfolio_values.mean(), market_deviations)
+                        / np.dot(market_deviations, market_deviations))
+        
+        return _PortfolioCore(
+            total_investment=total_investment,
+            position_values=position_values,
+            weights=weights,
+            historical_returns=historical_returns,
+            historical_volatility=historical_volatility,
+            portfolio_returns=historical_portfolio_returns,
+            annual_return=historical_annual_return,
+            annual_volatility=historical_annual_volatility,
+            beta=beta,
+            market_data=market_data
+        )
+    
+    def _fetch_prices(self, ticker_lists, start_date, end_date):
+        """
+        Load independent ticker lists concurrently, one loader call (and cache entry) per list.
+        
+        Returns:
+            list: Price DataFrames in the order of ticker_lists
+        """
+        start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+        with ThreadPoolExecutor(max_workers=len(ticker_lists)) as executor:
+            futures = [executor.submit(self.price_loader, tickers, start=start, end=end)
+                       for tickers in ticker_lists]
+            return [future.result() for future in futures]
+    
+    def _get_holdings(self, etf):
+        """Top holdings of an ETF, fetched once per process."""
+        if etf not in self._holdings_cache:
+            if etf not in self._ticker_cache:
+                self._ticker_cache[etf] = yf.Ticker(etf)
+            self._holdings_cache[etf] = self._ticker_cache[etf].get_holdings()
+        return self._holdings_cache[etf]
+    
     def _analyze_market_conditions(self, market_data):
         """Analyze current market conditions using S&P 500 data."""
         try:
@@ -168,11 +328,11 @@ class PortfolioAnalyzer:
                     "market_trend": 0.0
                 }
             
-            returns = market_data.pct_change().dropna()
+            returns = market_data.pct_change(fill_method=None).dropna()
             recent_returns = returns.tail(20)  # Last 20 trading days
             
             # Calculate market metrics
-            volatility = returns.std() * np.sqrt(252)
+            volatility = returns.std() * sqrt_trading_days
             trend = (market_data.iloc[-1] / market_data.iloc[0] - 1) * 100
             
             # Determine market condition
@@ -202,30 +362,13 @@ class PortfolioAnalyzer:
         opinion = []
         
         # Return analysis
-        if annual_return > 0.15:
-            opinion.append("Strong return potential with annual return above 15%")
-        elif annual_return > 0.10:
-            opinion.append("Good return potential with annual return above 10%")
-        elif annual_return > 0.05:
-            opinion.append("Moderate return potential with annual return above 5%")
-        else:
-            opinion.append("Low return potential with annual return below 5%")
+        opinion.append(_return_opinions[bisect.bisect_left(_return_thresholds, annual_return)])
         
         # Risk analysis
-        if annual_volatility < 0.15:
-            opinion.append("Low volatility portfolio, suitable for conservative investors")
-        elif annual_volatility < 0.25:
-            opinion.append("Moderate volatility, balanced risk-reward profile")
-        else:
-            opinion.append("High volatility portfolio, suitable for aggressive investors")
+        opinion.append(_volatility_opinions[bisect.bisect_right(_volatility_thresholds, annual_volatility)])
         
         # Sharpe ratio analysis
-        if sharpe_ratio > 1.5:
-            opinion.append("Excellent risk-adjusted returns with Sharpe ratio above 1.5")
-        elif sharpe_ratio > 1.0:
-            opinion.append("Good risk-adjusted returns with Sharpe ratio above 1.0")
-        else:
-            opinion.append("Below-average risk-adjusted returns")
+        opinion.append(_sharpe_opinions[bisect.bisect_left(_sharpe_thresholds, sharpe_ratio)])
         
         # Beta analysis
         if beta < 0.8:
@@ -257,102 +400,100 @@ class PortfolioAnalyzer:
             dict: Recommended stocks with analysis
         """
         try:
-            # Get current portfolio metrics
-            current_analysis = self.analyze_proposed_portfolio(portfolio_data)
-            if "error" in current_analysis:
-                return {"error": current_analysis["error"]}
-            
-            current_metrics = current_analysis["portfolio_metrics"]
-            current_beta = current_metrics["beta"]
-            current_volatility = current_metrics["historical_metrics"]["annual_volatility"]
-            
             # Get historical data for sector ETFs
             end_date = datetime.now()
             start_date = end_date - timedelta(days=365)
             
-            # Get historical data for all sector ETFs
-            etf_data = get_price_data(list(self.sector_etfs.keys()), 
-                                    start=start_date.strftime("%Y-%m-%d"),
-                                    end=end_date.strftime("%Y-%m-%d"))
+            # Get historical data for all sector ETFs (one portfolio-independent cache entry)
+            # in the background while the portfolio and market prices load
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                etf_future = executor.submit(self._fetch_prices, [list(self.sector_etfs.keys())],
+                                             start_date, end_date)
+                # Get current portfolio metrics, reusing the analyzer's historical returns and weights
+                core = self._compute_core(portfolio_data, start_date, end_date)
+                etf_data, = etf_future.result()
+            
+            if core is None:
+                return {"error": "Failed to fetch historical price data. Please check ticker symbols."}
+            
+            current_beta = core.beta
+            current_volatility = core.annual_volatility
+            portfolio_returns = core.portfolio_returns
             
             if etf_data.empty:
                 return {"error": "Failed to fetch sector ETF data"}
             
             # Calculate sector correlations with current portfolio
-            returns = etf_data.pct_change().dropna()
-            
-            # Get current portfolio returns
-            current_tickers = list(portfolio_data.keys())
-            current_prices = get_price_data(current_tickers,
-                                          start=start_date.strftime("%Y-%m-%d"),
-                                          end=end_date.strftime("%Y-%m-%d"))
+            returns = etf_data.pct_change(fill_method=None).dropna()
             
-            if current_prices.empty:
-                return {"error": "Failed to fetch current portfolio price data"}
-            
-            current_returns = current_prices.pct_change().dropna()
-            
-            # Calculate portfolio returns using weights
-            weights = {ticker: (price * shares) / sum(price * shares for price, shares in portfolio_data.values())
-                      for ticker, (price, shares) in portfolio_data.items()}
-            
-            portfolio_returns = current_returns.dot(pd.Series(weights))
-            
-            # Calculate correlations with each sector ETF
+            # Align dates between portfolio returns and ETF returns once, then correlate
+            # every sector ETF against the portfolio in a single pass
+            etf_columns = [etf for etf in self.sector_etfs.keys() if etf in returns.columns]
+            aligned = returns[etf_columns].join(portfolio_returns.rename('port'), how='inner').dropna()
             correlations = {}
-            for etf in self.sector_etfs.keys():
-                if etf in returns.columns:
-                    # Align dates between portfolio returns and ETF returns
-                    common_dates = portfolio_returns.index.intersection(returns.index)
-                    if len(common_dates) > 0:
-                        corr = returns.loc[common_dates, etf].corr(portfolio_returns.loc[common_dates])
-                        correlations[etf] = corr
+            if not aligned.empty:
+                correlations = aligned.drop(columns='port').corrwith(aligned['port']).to_dict()
             
             # Find sectors with low correlation to current portfolio
             low_corr_sectors = sorted(correlations.items(), key=lambda x: abs(x[1]))[:3]
             
-            # Get top stocks from low correlation sectors
-            recommendations = []
+            # Collect candidate holdings from low correlation sectors first, so their
+            # prices can be fetched in a single multi-ticker request
+            candidates = []
             for etf, _ in low_corr_sectors:
                 sector = self.sector_etfs[etf]
                 # Get top holdings of the ETF
-                etf_info = yf.Ticker(etf)
                 try:
-                    holdings = etf_info.get_holdings()
+                    holdings = self._get_holdings(etf)
                     if holdings is not None and not holdings.empty:
                         # Get top 5 holdings
                         top_holdings = holdings.head(5)
                         for _, holding in top_holdings.iterrows():
                             ticker = holding['ticker']
                             if ticker not in portfolio_data:  # Don't recommend stocks already in portfolio
-                                # Get stock data
-                                stock_data = get_price_data([ticker], 
-                                                          start=start_date.strftime("%Y-%m-%d"),
-                                                          end=end_date.strftime("%Y-%m-%d"))
-                                if not stock_data.empty:
-                                    stock_returns = stock_data.pct_change().dropna()
-                                    
-                                    # Align dates for correlation calculation
-                                    common_dates = portfolio_returns.index.intersection(stock_returns.index)
-                                    if len(common_dates) > 0:
-                                        stock_volatility = stock_returns.loc[common_dates].std() * np.sqrt(252)
-                                        stock_beta = stock_returns.loc[common_dates].corr(portfolio_returns.loc[common_dates])
-                                        
-                                        # Calculate potential improvement
-                                        potential_volatility = (current_volatility + stock_volatility.iloc[0]) / 2
-                                        potential_beta = (current_beta + stock_beta.iloc[0]) / 2
-                                        
-                                        recommendations.append({
-                                            'ticker': ticker,
-                                            'sector': sector,
-                                            'current_price': stock_data.iloc[-1].iloc[0],
-                                            'volatility': float(stock_volatility.iloc[0]),
-                                            'beta': float(stock_beta.iloc[0]),
-                                            'potential_improvement': {
-                                                'volatility_reduction': float(current_volatility - potential_volatility),
-                                                'beta_reduction': float(current_beta - potential_beta)
-                                            }
-                                        })
+                                candidates.append((ticker, sector))
+                except Exception as e:
+                    continue
+            
+            candidate_data = pd.DataFrame()
+            if candidates:
+                # Unaligned, so each candidate keeps its own full history; NaNs are dropped per column below
+                candidate_data = self.price_loader(list(dict.fromkeys(ticker for ticker, _ in candidates)),
+                                                   start=start_date.strftime("%Y-%m-%d"),
+                                                   end=end_date.strftime("%Y-%m-%d"),
+                                                   align=False)
+            
+            # Get top stocks from low correlation sectors
+            recommendations = []
+            for ticker, sector in candidates:
+                if ticker not in candidate_data.columns:
+                    continue
+                try:
+                    stock_data = candidate_data[[ticker]].dropna()
+                    if not stock_data.empty:
+                        stock_returns = stock_data.pct_change(fill_method=None).dropna()
+                        
+                        # Align dates for correlation calculation
+                        common_dates = portfolio_returns.index.intersection(stock_returns.index)
+                        if len(common_dates) > 0:
+                            stock_volatility = stock_returns.loc[common_dates].std() * sqrt_trading_days
+                            stock_beta = stock_returns.loc[common_dates].corr(portfolio_returns.loc[common_dates])
+                            
+                            # Calculate potential improvement
+                            potential_volatility = (current_volatility + stock_volatility.iloc[0]) / 2
+                            potential_beta = (current_beta + stock_beta.iloc[0]) / 2
+                            
+                            recommendations.append({
+                                'ticker': ticker,
+                                'sector': sector,
+                                'current_price': stock_data.iloc[-1].iloc[0],
+                                'volatility': float(stock_volatility.iloc[0]),
+                                'beta': float(stock_beta.iloc[0]),
+                                'potential_improvement': {
+                                    'volatility_reduction': float(current_volatility - potential_volatility),
+                                    'beta_reduction': float(current_beta - potential_beta)
+                                }
+                            })
                 except Exception as e:
                     continue
             
@@ -368,9 +509,8 @@ class PortfolioAnalyzer:
             if not recommendations and low_corr_sectors:
                 best_etf, _ = low_corr_sectors[0]
                 sector = self.sector_etfs[best_etf]
-                etf_info = yf.Ticker(best_etf)
                 try:
-                    holdings = etf_info.get_holdings()
+                    holdings = self._get_holdings(best_etf)
                     if holdings is not None and not holdings.empty:
                         top_holdings = holdings.head(5)
                         for _, holding in top_holdings.iterrows():
@@ -1,21 +1,32 @@
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 
-def plot_weights(weights, tickers):
-    fig, ax = plt.subplots(figsize=(6, 6))
+def plot_weights(weights, tickers, ax=None):
+    # Draw onto a caller-supplied Axes when given, so repeated redraws can reuse one Figure
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(6, 6))
+    else:
+        fig = ax.figure
     ax.pie(weights, labels=tickers, autopct='%1.1f%%', startangle=140)
     ax.set_title("Optimized Portfolio Allocation")
     ax.axis('equal')
     return fig
 
-def plot_return_vs_risk(returns_df):
-    mean_returns = returns_df.pct_change().mean() * 252
-    risks = returns_df.pct_change().std() * np.sqrt(252)
+def plot_return_vs_risk(returns_df, ax=None):
+    # One pct_change for both statistics; ddof=1 keeps pandas' sample std
+    daily_returns = returns_df.pct_change(fill_method=None).dropna().to_numpy()
+    mean_returns = daily_returns.mean(axis=0) * 252
+    risks = daily_returns.std(axis=0, ddof=1) * np.sqrt(252)
 
-    fig, ax = plt.subplots(figsize=(8, 5))
-    sns.barplot(x=returns_df.columns, y=mean_returns.values, ax=ax, color='green', label='Return')
-    sns.barplot(x=returns_df.columns, y=risks.values, ax=ax, color='red', alpha=0.5, label='Risk')
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(8, 5))
+    else:
+        fig = ax.figure
+    x = np.arange(len(returns_df.columns))
+    ax.bar(x - 0.2, mean_returns, width=0.4, color='green', label='Return')
+    ax.bar(x + 0.2, risks, width=0.4, color='red', alpha=0.5, label='Risk')
+    ax.set_xticks(x)
+    ax.set_xticklabels(returns_df.columns)
     ax.set_title("Annualized Return vs. Risk")
     ax.set_ylabel("Percentage")
     ax.legend()